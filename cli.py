@@ -1,14 +1,91 @@
 # cli.py
 import os
-import tkinter as tk
-from tkinter import filedialog
 import queue
-from core.orchestrator import Orchestrator, CONVERSATIONS_DIR
+
+# readline abilita editing e history C-level per input(): le righe arrivano
+# già complete invece di essere assemblate carattere per carattere
+try:
+    import readline  # noqa: F401
+except ImportError:
+    pass  # Non disponibile su alcune piattaforme (es. Windows senza pyreadline)
+from core.orchestrator import Orchestrator, CONVERSATIONS_DIR, list_saved_sessions, _DEV_TRIGGER_RE
 from rich.console import Console
-from rich.markdown import Markdown
 from rich.prompt import Prompt
 
 
+# Tabella precompilata per sanitizzare i nomi sessione in nomi file validi
+_SESSION_ID_TABLE = str.maketrans({' ': '_', '/': '_', '\\': '_'})
+
+# Template di markup precompilati per il replay della cronologia: il markup
+# statico non va ricostruito con una f-string ad ogni riga
+_USER_LINE = "[bold cyan]{}:[/bold cyan] {}"
+_BOT_LINE = "[bold green]{}:[/bold green] {}"
+
+# Frase che avvia la fase di sviluppo (deve restare allineata ai
+# trigger_phrases dell'orchestratore)
+# Il rilevamento dei trigger di sviluppo riusa l'alternation
+# dell'orchestrator (_DEV_TRIGGER_RE): stessa lista di frasi, stessa
+# semantica case-insensitive sulla testa del messaggio
+
+
+def _noop_handler(console, body):
+    """Segnale da ignorare in questa fase."""
+    pass
+
+
+def _print_claude_prompt(console, body):
+    prompt_text = body.strip()
+    console.print(f"\n📝 [bold blue]Architetto → Claude:[/bold blue]")
+    console.print(f"[dim]{prompt_text[:100]}{'...' if len(prompt_text) > 100 else ''}[/dim]")
+
+
+# Dispatch table per i segnali speciali dello stream: il tag tra parentesi
+# quadre viene estratto una sola volta, niente catena di startswith per chunk.
+_BASE_HANDLERS = {
+    'THINKING': lambda c, b: c.print("🤔 ", end="", style="yellow"),
+    'INFO': lambda c, b: c.print(f"\nℹ️  {b}", style="blue"),
+}
+
+# Prima fase (brainstorming/avvio): i segnali di sviluppo vengono silenziati
+FIRST_PHASE_HANDLERS = {
+    **_BASE_HANDLERS,
+    'CLAUDE_PROMPT': _noop_handler,
+    'CLAUDE_WORKING': _noop_handler,
+    'CYCLE_COMPLETE': _noop_handler,
+}
+
+# Monitoraggio sviluppo: tutti i segnali vengono mostrati per trasparenza
+MONITOR_HANDLERS = {
+    **_BASE_HANDLERS,
+    'CLAUDE_PROMPT': _print_claude_prompt,
+    'CLAUDE_WORKING': lambda c, b: c.print("\n⚡ [bold green]Claude al lavoro...[/bold green]"),
+    'CYCLE_COMPLETE': lambda c, b: c.print(f"\n{b[1:]}", style="bold cyan"),
+}
+
+
+def _render_batch(console, chunks, handlers):
+    """Renderizza i chunk dello stream usando la dispatch table dei segnali.
+
+    Il testo semplice consecutivo viene coalizzato in una singola print:
+    ogni chiamata a console.print ha un costo fisso di layout/flush.
+    """
+    pending = []
+    for chunk in chunks:
+        if chunk and chunk[0] == '[':
+            end = chunk.find(']', 1)
+            if end != -1:
+                handler = handlers.get(chunk[1:end])
+                if handler is not None:
+                    if pending:
+                        console.print("".join(pending), end="")
+                        pending.clear()
+                    handler(console, chunk[end + 1:])
+                    continue
+        pending.append(chunk)
+    if pending:
+        console.print("".join(pending), end="")
+
+
 def get_multiline_input(console, lang='en'):
     """Gestisce l'input multiriga dall'utente."""
     if lang == 'it':
@@ -18,19 +95,28 @@ def get_multiline_input(console, lang='en'):
         console.print("[dim]You can use multiple lines. Press Enter on empty line to send.[/dim]")
         prompt_text = "[bold cyan]You[/bold cyan]"
     
+    # Prompt precalcolati: evita di ri-renderizzare il markup ad ogni riga
+    first_prompt = f"{prompt_text}: "
+    continuation_prompt = "[dim]...[/dim] "
+
     lines = []
     try:
         while True:
             if lines:
-                line = console.input("[dim]...[/dim] ")  # Continuazione
+                line = console.input(continuation_prompt)  # Continuazione
             else:
-                line = console.input(f"{prompt_text}: ")  # Prima riga
+                line = console.input(first_prompt)  # Prima riga
                 
             if not line:  # Riga vuota = fine input
                 if lines:  # Se ci sono già righe, invia
                     break
                 else:  # Se è la prima riga vuota, chiedi di nuovo
                     continue
+            # Short-circuit per i comandi su riga singola: niente secondo
+            # Invio per uscire o avviare lo sviluppo
+            if not lines and (line.lower() in ("esci", "exit", "quit")
+                              or _DEV_TRIGGER_RE.search(line[:64])):
+                return line
             lines.append(line)
     except KeyboardInterrupt:
         # Ritorna None per indicare che l'utente vuole uscire
@@ -40,7 +126,7 @@ def get_multiline_input(console, lang='en'):
 
 def main():
     console = Console()
-    console.print(Markdown("# Benvenuto in Project Prometheus (CLI v5.1) / Welcome to Project Prometheus"))
+    console.print("Benvenuto in Project Prometheus (CLI v5.1) / Welcome to Project Prometheus", style="bold")
     
     # 1. Selezione Lingua
     lang = Prompt.ask("Scegli una lingua / Choose a language", choices=["it", "en"], default="en")
@@ -94,19 +180,26 @@ def main():
     }
     
     msg = messages[lang]
-    console.print(Markdown(f"*{msg['development_trigger']}*"))
+    console.print(f"[italic]{msg['development_trigger']}[/italic]")
 
     # 2. Ripristino o Nuova Sessione
     orchestrator = None
     if not os.path.exists(CONVERSATIONS_DIR): 
         os.makedirs(CONVERSATIONS_DIR)
     
-    saved_sessions = sorted([f.replace('.json', '') for f in os.listdir(CONVERSATIONS_DIR) if f.endswith('.json')], reverse=True)
+    # Controllo di esistenza lazy: il generatore si ferma al primo .json
+    # trovato, la lista completa viene materializzata solo se l'utente
+    # sceglie davvero di riprendere una sessione
+    try:
+        has_saved_sessions = any(entry.name.endswith('.json') for entry in os.scandir(CONVERSATIONS_DIR))
+    except OSError:
+        has_saved_sessions = False
 
-    if saved_sessions:
+    if has_saved_sessions:
         try:
             if Prompt.ask(msg['continue_session'], choices=["si", "yes", "no"], default="no") in ["si", "yes"]:
                 console.print(f"\n[bold green]{msg['select_session']}[/bold green]")
+                saved_sessions = list_saved_sessions()
                 session_choices = {str(i+1): s for i, s in enumerate(saved_sessions)}
                 for key, val in session_choices.items():
                     console.print(f"  [{key}] - {val}")
@@ -127,41 +220,62 @@ def main():
             console.print(f"\n[bold red]{msg['goodbye']}[/bold red]")
             return
         # Sostituisce spazi e caratteri non validi per un nome file
-        session_id = session_name.replace(" ", "_").replace("/", "_").replace("\\", "_").lower()
+        session_id = session_name.translate(_SESSION_ID_TABLE).lower()
         orchestrator = Orchestrator(session_id=session_id, lang=lang, architect_llm=architect_llm)
         
-        # Chiedi la directory di lavoro usando il selettore nativo
-        while not orchestrator.working_directory:
-            console.print(f"\n[bold yellow]{msg['directory_prompt']}[/bold yellow]")
-            root = tk.Tk()
-            root.withdraw()  # Nasconde la finestra principale di Tkinter
-            
-            # Localizza il titolo del dialog
-            dialog_title = "Seleziona la cartella di progetto" if lang == 'it' else "Select project folder"
-            directory_path = filedialog.askdirectory(title=dialog_title)
-            root.destroy()
-            
-            if not directory_path:
-                console.print(f"[bold red]{msg['selection_canceled']}[/bold red]")
+        # Chiedi la directory di lavoro usando il selettore nativo.
+        # Tkinter viene importato solo qui: caricarlo all'avvio rallenta
+        # anche le sessioni riprese che non aprono mai il selettore.
+        import tkinter as tk
+        from tkinter import filedialog
+
+        # Un'unica root Tkinter nascosta viene riutilizzata per tutti i retry:
+        # creare/distruggere la root ad ogni tentativo è costoso.
+        root = None
+        try:
+            while not orchestrator.working_directory:
+                console.print(f"\n[bold yellow]{msg['directory_prompt']}[/bold yellow]")
+                if root is None:
+                    root = tk.Tk()
+                    root.withdraw()  # Nasconde la finestra principale di Tkinter
+
+                # Localizza il titolo del dialog
+                dialog_title = "Seleziona la cartella di progetto" if lang == 'it' else "Select project folder"
+                directory_path = filedialog.askdirectory(title=dialog_title)
+
+                if not directory_path:
+                    console.print(f"[bold red]{msg['selection_canceled']}[/bold red]")
+                    continue
+
+                response = orchestrator.set_working_directory(directory_path)
+                console.print(f"[bold green]Prometheus:[/bold green] {response}")
+
+                # "ERRORE" contiene "ERROR": basta una sola scansione
+                if "ERROR" in response:
+                    orchestrator.working_directory = None  # Resetta se c'è stato un errore
+                else:
+                    console.print(f"[bold blue]{msg['directory_set']}[/bold blue]")
+                    orchestrator.save_state()  # Salva lo stato con la nuova directory
+        finally:
+            if root is not None:
+                root.destroy()
+
+    # Stampa la cronologia esistente o il messaggio iniziale.
+    # Le righe vengono accumulate e renderizzate con una singola print:
+    # una chiamata console.print per riga è costosa su cronologie lunghe.
+    if orchestrator.conversation_history:
+        rendered_lines = []
+        for line in orchestrator.conversation_history:
+            # partition + slice: un solo passaggio sulla riga "[Speaker]: testo",
+            # senza la lista intermedia di split né la scansione di replace
+            speaker, sep, text = line.partition("]: ")
+            if not sep:
+                rendered_lines.append(line)
                 continue
-                
-            response = orchestrator.set_working_directory(directory_path)
-            console.print(f"[bold green]Prometheus:[/bold green] {response}")
-            
-            if "ERRORE" in response or "ERROR" in response:
-                orchestrator.working_directory = None  # Resetta se c'è stato un errore
-            else:
-                console.print(f"[bold blue]{msg['directory_set']}[/bold blue]")
-                orchestrator.save_state()  # Salva lo stato con la nuova directory
-
-    # Stampa la cronologia esistente o il messaggio iniziale
-    for line in orchestrator.conversation_history:
-        speaker, text = line.split("]: ", 1)
-        speaker = speaker.replace("[", "")
-        if speaker == "User":
-             console.print(f"[bold cyan]{speaker}:[/bold cyan] {text}")
-        else:
-            console.print(f"[bold green]{speaker}:[/bold green] {text}")
+            speaker = speaker[1:]
+            template = _USER_LINE if speaker == "User" else _BOT_LINE
+            rendered_lines.append(template.format(speaker, text))
+        console.print("\n".join(rendered_lines))
 
     # Mostra la directory di lavoro se impostata
     if orchestrator.working_directory:
@@ -169,6 +283,13 @@ def main():
         console.print(f"[dim]{working_dir_msg}[/dim]\n")
 
     # 4. Ciclo principale con input multiriga
+    # Binding locali per i valori usati ad ogni iterazione: evita lookup
+    # ripetuti su dict e attributi nel percorso caldo
+    thinking_msg = msg['thinking']
+    output_queue = orchestrator.output_queue
+    q_get = output_queue.get
+    q_get_nowait = output_queue.get_nowait
+
     while True:
         try:
             user_input = get_multiline_input(console, lang)
@@ -177,98 +298,114 @@ def main():
 
             console.print("[bold green]Prometheus:[/bold green] ", end="")
             
-            # Controlla se stiamo avviando lo sviluppo
-            is_starting_development = "ACCENDI I MOTORI!" in user_input.upper()
+            # Controlla se stiamo avviando lo sviluppo (stessa detection
+            # dell'orchestrator, non solo la frase italiana storica)
+            is_starting_development = _DEV_TRIGGER_RE.search(user_input[:64]) is not None
             
             # Status indicator dinamico basato sulla modalità
             if orchestrator.mode == "DEVELOPMENT" or is_starting_development:
                 status_msg = "Sto sviluppando..." if lang == 'it' else "Developing..."
                 status_style = "bold green"
             else:
-                status_msg = msg['thinking']
+                status_msg = thinking_msg
                 status_style = "italic"
             
-            with console.status(f"[{status_style}]{status_msg}...[/{status_style}]", spinner="dots"):
+            # Spinner gestito manualmente: si ferma al primo chunk renderizzato,
+            # così il LiveDisplay di Rich non contende il lock della console
+            # con il percorso di streaming
+            status = console.status(f"[{status_style}]{status_msg}...[/{status_style}]", spinner="dots")
+            status.start()
+            status_active = True
+            try:
                 # Process input (non-blocking, puts output in queue)
                 orchestrator.process_user_input(user_input)
-                
-                # Read from output queue until we get the end signal (None)
-                first_phase_done = False
-                while True:
+
+                # Read from output queue until we get the end signal (None).
+                # Blocking get + batch-drain: niente polling con timeout, e molti
+                # chunk vengono processati per ogni risveglio del consumer.
+                streaming = True
+                while streaming:
                     try:
-                        chunk = orchestrator.output_queue.get(timeout=1.0)
-                        if chunk is None:  # End signal
-                            if is_starting_development and not first_phase_done:
-                                # Prima fase completata (brainstorming), ma continua per lo sviluppo
-                                first_phase_done = True
-                                continue
-                            else:
-                                # Fine normale o sviluppo terminato
+                        batch = [q_get()]  # Attesa event-driven
+                        while True:
+                            try:
+                                batch.append(q_get_nowait())
+                            except queue.Empty:
                                 break
-                        # Gestisci segnali speciali anche nella prima fase
-                        if chunk.startswith("[THINKING]"):
-                            console.print("🤔 ", end="", style="yellow")
-                        elif chunk.startswith("[CLAUDE_PROMPT]"):
-                            # Skip durante la prima fase per evitare spam
-                            pass
-                        elif chunk.startswith("[CLAUDE_WORKING]"):
-                            # Skip durante la prima fase
-                            pass 
-                        elif chunk.startswith("[CYCLE_COMPLETE]"):
-                            # Skip durante la prima fase
-                            pass
-                        elif chunk.startswith("[INFO]"):
-                            console.print(f"\nℹ️  {chunk[6:]}", style="blue")
-                        else:
-                            console.print(chunk, end="")
-                        orchestrator.output_queue.task_done()
-                    except queue.Empty:
-                        # Se stiamo sviluppando e il thread è ancora attivo, continua ad aspettare
-                        if is_starting_development and orchestrator.is_running:
-                            continue
-                        else:
-                            break
-                    except:
+                    except KeyboardInterrupt:
+                        # Stesso percorso di pausa del monitoring: ferma il
+                        # ciclo invece di lasciarlo girare senza consumer
+                        orchestrator.is_running = False
+                        orchestrator._pace_event.set()
+                        console.print("\n\n[bold yellow]⏸️  Sviluppo messo in pausa. Tornando al controllo manuale...[/bold yellow]\n")
                         break
+                    renderable = []
+                    for chunk in batch:
+                        if chunk is None:  # End signal
+                            # Ogni percorso produttore emette UNA sola
+                            # sentinella: chiude sempre lo stream corrente
+                            streaming = False
+                            break
+                        renderable.append(chunk)
+                    # Gestisci segnali speciali anche nella prima fase
+                    if renderable:
+                        if status_active:
+                            status.stop()
+                            status_active = False
+                        _render_batch(console, renderable, FIRST_PHASE_HANDLERS)
+                    # Sviluppo attivo (avviato ora o riavviato dal feedback
+                    # utente): il ciclo autonomo emette la sentinella solo a
+                    # fine corsa, quindi si passa subito al loop di monitoring
+                    # (che ha il suo drain e resta sensibile a Ctrl+C) invece
+                    # di restare bloccati qui sulla get
+                    if streaming and orchestrator.is_running:
+                        streaming = False
+            finally:
+                if status_active:
+                    status.stop()
             console.print()
             
             # Se lo sviluppo è in corso, entra in modalità monitoring
-            if is_starting_development and orchestrator.is_running:
+            if orchestrator.is_running:
                 console.print(f"\n[bold yellow]🔄 Ciclo di sviluppo autonomo attivo![/bold yellow]")
                 console.print(f"[dim]Il sistema continuerà a sviluppare autonomamente. Vedrai l'output in tempo reale.[/dim]")
                 console.print(f"[dim]Premi Ctrl+C in qualsiasi momento per tornare al controllo manuale.[/dim]\n")
                 
-                # Loop di monitoraggio sviluppo
+                # Loop di monitoraggio sviluppo: drena la coda in batch e usa
+                # done_event solo per restare reattivo a Ctrl+C quando è vuota.
                 try:
-                    while orchestrator.is_running:
+                    monitoring = True
+                    while monitoring:
                         try:
-                            # Controlla se c'è nuovo output (timeout più lungo per ridurre CPU usage)
-                            chunk = orchestrator.output_queue.get(timeout=2.0)
-                            if chunk is None:
-                                continue
-                            
-                            # Mostra tutto l'output sviluppo, inclusi i segnali di debug per trasparenza
-                            if chunk.startswith("[THINKING]"):
-                                console.print("🤔 ", end="", style="yellow")
-                            elif chunk.startswith("[CLAUDE_PROMPT]"):
-                                prompt_text = chunk[15:].strip()
-                                console.print(f"\n📝 [bold blue]Architetto → Claude:[/bold blue]")
-                                console.print(f"[dim]{prompt_text[:100]}{'...' if len(prompt_text) > 100 else ''}[/dim]")
-                            elif chunk.startswith("[CLAUDE_WORKING]"):
-                                console.print("\n⚡ [bold green]Claude al lavoro...[/bold green]")
-                            elif chunk.startswith("[CYCLE_COMPLETE]"):
-                                console.print(f"\n{chunk[17:]}", style="bold cyan")  # Rimuove il prefisso e aggiunge newline
-                            elif chunk.startswith("[INFO]"):
-                                console.print(f"\nℹ️  {chunk[6:]}", style="blue")  # Messaggi informativi
-                            else:
-                                console.print(chunk, end="")
-                            orchestrator.output_queue.task_done()
+                            batch = [q_get_nowait()]
+                            while True:
+                                try:
+                                    batch.append(q_get_nowait())
+                                except queue.Empty:
+                                    break
                         except queue.Empty:
-                            # Nessun output, continua il loop
+                            # Nessun output: attesa breve sull'evento di fine produttore
+                            if orchestrator.done_event.wait(timeout=0.5) and output_queue.empty():
+                                break
                             continue
+
+                        renderable = []
+                        for chunk in batch:
+                            if chunk is None:
+                                # Segnale di fine stream: chiudi il monitoring se il
+                                # ciclo di sviluppo è terminato, invece di scartarlo
+                                if not orchestrator.is_running:
+                                    monitoring = False
+                                continue
+                            renderable.append(chunk)
+
+                        # Mostra tutto l'output sviluppo, inclusi i segnali di debug per trasparenza
+                        if renderable:
+                            _render_batch(console, renderable, MONITOR_HANDLERS)
                 except KeyboardInterrupt:
                     # Ctrl+C per tornare al controllo manuale
                     orchestrator.is_running = False
+                    orchestrator._pace_event.set()  # Sblocca subito la pausa tra i cicli
                     console.print("\n\n[bold yellow]⏸️  Sviluppo messo in pausa. Tornando al controllo manuale...[/bold yellow]\n")
                     # Non fare break dal loop principale, continua con il prompt normale
 
@@ -2,7 +2,7 @@
 import os
 import re
 import queue
-from datetime import datetime
+import time
 
 # FORCE debug logging initialization FIRST - before any other imports
 import sys
@@ -74,7 +74,7 @@ sys.stderr.write("🏁 WEB_APP: Debug initialization completed\n")
 sys.stderr.flush()
 
 from flask import Flask, render_template, request, jsonify, Response, make_response
-from core.orchestrator import CONVERSATIONS_DIR, StatusEnum
+from core.orchestrator import CONVERSATIONS_DIR, StatusEnum, list_saved_sessions
 
 app = Flask(__name__)
 orchestrator_instances = {}
@@ -112,7 +112,7 @@ def get_orchestrator(session_id, lang='en', architect_llm='gemini'):
         if not hasattr(orchestrator, 'status'):
             orchestrator.status = StatusEnum.IDLE
         if not hasattr(orchestrator, 'status_updated_at'):
-            orchestrator.status_updated_at = datetime.now()
+            orchestrator.status_updated_at = time.time()
             
     return orchestrator_instances[session_id]
 
@@ -229,11 +229,7 @@ def chat():
 @app.route("/api/conversations", methods=["GET"])
 def get_conversations():
     """Restituisce la lista di tutte le conversazioni salvate."""
-    if not os.path.exists(CONVERSATIONS_DIR):
-        return jsonify([])
-    
-    sessions = sorted([f.replace('.json', '') for f in os.listdir(CONVERSATIONS_DIR) if f.endswith('.json')], reverse=True)
-    return jsonify(sessions)
+    return jsonify(list_saved_sessions())
 
 @app.route("/api/history/<session_id>", methods=["GET"])
 def get_history(session_id):